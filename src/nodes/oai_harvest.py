@@ -2,23 +2,61 @@
 
 - Uses T-2 (day before yesterday) for timezone safety
 - Saves parquet per day: raw/papers/{YYYY-MM-DD}.parquet
-- Tracks fetched_dates in state for transform to diff against
+- State holds only last_fetched_date; the transform lists raw/papers/ to find fetched dates
 """
-import xml.etree.ElementTree as ET
+import contextvars
+import itertools
+import signal
+import sys
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import date, timedelta
+from typing import Iterable
 import httpx
 import pyarrow as pa
-from subsets_utils import get, load_state, save_state, save_raw_parquet
+from lxml import etree
+from subsets_utils import get_stream, load_state, save_state, save_raw_parquet
 
 BASE_URL = "https://oaipmh.arxiv.org/oai"
 GH_ACTIONS_MAX_RUN_SECONDS = 5.5 * 60 * 60
 # arXiv OAI-PMH earliest datestamp (from Identify response)
 EARLIEST_DATE = date(2005, 9, 16)
-
-NS = {
-    'oai': 'http://www.openarchives.org/OAI/2.0/',
-    'arx': 'http://arxiv.org/OAI/arXiv/',
+# arXiv asks for at least 3 seconds between consecutive requests
+REQUEST_INTERVAL = 3.0
+# Persist state every N completed days; a resumed run refetches at most this many
+SAVE_EVERY = 10
+
+_last_request_at = 0.0
+
+# Namespace-qualified (Clark notation) tags, resolved once instead of per lookup
+OAI_NS = '{http://www.openarchives.org/OAI/2.0/}'
+ARX_NS = '{http://arxiv.org/OAI/arXiv/}'
+
+OAI_RECORD = f'{OAI_NS}record'
+OAI_ERROR = f'{OAI_NS}error'
+OAI_TOKEN = f'{OAI_NS}resumptionToken'
+OAI_HEADER = f'{OAI_NS}header'
+OAI_IDENTIFIER = f'{OAI_NS}identifier'
+OAI_DATESTAMP = f'{OAI_NS}datestamp'
+OAI_METADATA = f'{OAI_NS}metadata'
+
+ARX_ARXIV = f'{ARX_NS}arXiv'
+ARX_TITLE = f'{ARX_NS}title'
+ARX_ABSTRACT = f'{ARX_NS}abstract'
+ARX_CATEGORIES = f'{ARX_NS}categories'
+ARX_LICENSE = f'{ARX_NS}license'
+ARX_AUTHORS = f'{ARX_NS}authors'
+ARX_KEYNAME = f'{ARX_NS}keyname'
+ARX_FORENAMES = f'{ARX_NS}forenames'
+
+# <arXiv> children copied verbatim into the record
+ARX_TEXT_FIELDS = {
+    f'{ARX_NS}comments': 'comments',
+    f'{ARX_NS}journal-ref': 'journal_ref',
+    f'{ARX_NS}doi': 'doi',
+    f'{ARX_NS}created': 'created',
+    f'{ARX_NS}updated': 'updated',
 }
 
 SCHEMA = pa.schema([
@@ -39,57 +77,112 @@ SCHEMA = pa.schema([
 
 
 def parse_record(record_elem) -> dict | None:
-    """Parse a single arXiv OAI record."""
-    header = record_elem.find('oai:header', NS)
+    """Parse a single arXiv OAI record. Returns None for records to skip."""
+    header = record_elem.find(OAI_HEADER)
     if header is None or header.get('status') == 'deleted':
         return None
 
-    identifier = header.findtext('oai:identifier', '', NS)
-    arxiv_id = identifier.replace('oai:arXiv.org:', '') if identifier else None
+    identifier = header.findtext(OAI_IDENTIFIER)
+    if not identifier:
+        return None
+
+    # Records without arXiv metadata would only produce empty rows; skip them
+    metadata = record_elem.find(OAI_METADATA)
+    if metadata is None:
+        return None
+
+    arx = metadata.find(ARX_ARXIV)
+    if arx is None:
+        return None
 
     record = {
-        'id': arxiv_id,
-        'datestamp': header.findtext('oai:datestamp', '', NS),
-        'title': None, 'authors': [], 'abstract': None, 'categories': [],
+        'id': identifier.replace('oai:arXiv.org:', ''),
+        'datestamp': sys.intern(header.findtext(OAI_DATESTAMP, '')),
+        'title': '', 'authors': [], 'abstract': '', 'categories': [],
         'primary_category': None, 'comments': None, 'journal_ref': None,
         'doi': None, 'created': None, 'updated': None, 'license': None,
     }
 
-    metadata = record_elem.find('oai:metadata', NS)
-    if metadata is None:
-        return record
-
-    arx = metadata.find('arx:arXiv', NS)
-    if arx is None:
-        return record
-
-    record['title'] = arx.findtext('arx:title', '', NS).strip().replace('\n', ' ')
-    record['abstract'] = arx.findtext('arx:abstract', '', NS).strip()
-    record['comments'] = arx.findtext('arx:comments', None, NS)
-    record['journal_ref'] = arx.findtext('arx:journal-ref', None, NS)
-    record['doi'] = arx.findtext('arx:doi', None, NS)
-    record['license'] = arx.findtext('arx:license', None, NS)
-    record['created'] = arx.findtext('arx:created', None, NS)
-    record['updated'] = arx.findtext('arx:updated', None, NS)
-
-    categories_elem = arx.find('arx:categories', NS)
-    if categories_elem is not None and categories_elem.text:
-        record['categories'] = categories_elem.text.split()
-        if record['categories']:
-            record['primary_category'] = record['categories'][0]
-
-    authors_elem = arx.find('arx:authors', NS)
-    if authors_elem is not None:
-        for author in authors_elem.findall('arx:author', NS):
-            keyname = author.findtext('arx:keyname', '', NS)
-            forenames = author.findtext('arx:forenames', '', NS)
-            name = f"{forenames} {keyname}".strip()
-            if name:
-                record['authors'].append(name)
+    # Single pass over <arXiv> children, dispatching on tag
+    for child in arx:
+        tag = child.tag
+        if tag == ARX_AUTHORS:
+            for author in child:
+                keyname = forenames = ''
+                for part in author:
+                    if part.tag == ARX_KEYNAME:
+                        keyname = part.text or ''
+                    elif part.tag == ARX_FORENAMES:
+                        forenames = part.text or ''
+                name = f"{forenames} {keyname}".strip()
+                if name:
+                    record['authors'].append(name)
+        elif tag == ARX_TITLE:
+            record['title'] = (child.text or '').strip().replace('\n', ' ')
+        elif tag == ARX_ABSTRACT:
+            record['abstract'] = (child.text or '').strip()
+        elif tag == ARX_CATEGORIES:
+            if child.text:
+                # Low-cardinality values (also datestamp, license) are interned so rows share one str
+                record['categories'] = [sys.intern(c) for c in child.text.split()]
+                if record['categories']:
+                    record['primary_category'] = record['categories'][0]
+        elif tag == ARX_LICENSE:
+            record['license'] = sys.intern(child.text or '')
+        elif field := ARX_TEXT_FIELDS.get(tag):
+            record[field] = child.text or ''
 
     return record
 
 
+def wait_for_request_slot() -> None:
+    """Sleep only for what remains of REQUEST_INTERVAL since the last request.
+
+    Parsing and writing done since then counts towards the gap, so the
+    mandatory pause overlaps useful work instead of adding to it.
+    """
+    global _last_request_at
+    remaining = REQUEST_INTERVAL - (time.monotonic() - _last_request_at)
+    if remaining > 0:
+        time.sleep(remaining)
+    _last_request_at = time.monotonic()
+
+
+def parse_page(chunks: Iterable[bytes]) -> tuple[list[dict], str | None]:
+    """Parse a ListRecords response incrementally as its bytes arrive."""
+    parser = etree.XMLPullParser(events=('end',), tag=(OAI_RECORD, OAI_ERROR, OAI_TOKEN))
+    records = []
+    next_token = None
+
+    def events():
+        for chunk in chunks:
+            parser.feed(chunk)
+            yield from parser.read_events()
+        parser.close()
+        yield from parser.read_events()
+
+    for _, elem in events():
+        if elem.tag == OAI_RECORD:
+            if record := parse_record(elem):
+                records.append(record)
+        elif elem.tag == OAI_ERROR:
+            if elem.get('code') == 'noRecordsMatch':
+                # Drain the rest so the connection goes back to the pool
+                for _ in chunks:
+                    pass
+                return [], None
+            raise Exception(f"OAI error: {elem.text}")
+        else:
+            next_token = elem.text or None
+
+        # Drop parsed records so memory stays flat across the page
+        elem.clear(keep_tail=True)
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+    return records, next_token
+
+
 def fetch_page(target_date: date = None, resumption_token: str = None) -> tuple[list[dict], str | None]:
     """Fetch a page of records from OAI-PMH."""
     if resumption_token:
@@ -99,35 +192,31 @@ def fetch_page(target_date: date = None, resumption_token: str = None) -> tuple[
         url = f"{BASE_URL}?verb=ListRecords&metadataPrefix=arXiv&from={date_str}&until={date_str}"
 
     for attempt in range(3):
+        wait_for_request_slot()
         try:
-            response = get(url, timeout=120)
+            with get_stream(url, timeout=120) as response:
+                if response.status_code == 200:
+                    chunks = response.iter_bytes()
+                    first = next(chunks, b'')
+                    # Empty days come back as a tiny error document; skip the parser for them
+                    if b'code="noRecordsMatch"' in first:
+                        # Drain the rest so the connection goes back to the pool
+                        for _ in chunks:
+                            pass
+                        return [], None
+                    return parse_page(itertools.chain([first], chunks))
+                if response.status_code != 503:
+                    response.read()
+                    raise Exception(f"HTTP {response.status_code}: {response.text[:500]}")
+                retry_after = int(response.headers.get('Retry-After', 30))
             break
         except (httpx.TimeoutException, httpx.ConnectError, httpx.ReadError) as e:
             if attempt == 2:
                 raise
             time.sleep(30 * (attempt + 1))
 
-    if response.status_code == 503:
-        time.sleep(int(response.headers.get('Retry-After', 30)))
-        return fetch_page(target_date, resumption_token)
-
-    if response.status_code != 200:
-        raise Exception(f"HTTP {response.status_code}: {response.text[:500]}")
-
-    root = ET.fromstring(response.content)
-
-    error = root.find('.//oai:error', NS)
-    if error is not None:
-        if error.get('code') == 'noRecordsMatch':
-            return [], None
-        raise Exception(f"OAI error: {error.text}")
-
-    records = [r for elem in root.findall('.//oai:record', NS) if (r := parse_record(elem))]
-
-    token_elem = root.find('.//oai:resumptionToken', NS)
-    next_token = token_elem.text if token_elem is not None and token_elem.text else None
-
-    return records, next_token
+    time.sleep(retry_after)
+    return fetch_page(target_date, resumption_token)
 
 
 def fetch_date(target_date: date) -> list[dict]:
@@ -140,14 +229,61 @@ def fetch_date(target_date: date) -> list[dict]:
         page += 1
         records, token = fetch_page(target_date if page == 1 else None, token)
         all_records.extend(records)
-        print(f"+{len(records)}", end=" " if token else "\n")
         if not token:
             break
-        time.sleep(3)
 
     return all_records
 
 
+def write_day(day: date, records: list[dict]) -> None:
+    """Save one day's records as raw parquet."""
+    table = pa.Table.from_pylist(records, schema=SCHEMA)
+    save_raw_parquet(table, f"papers/{day.isoformat()}", compression='zstd')
+
+
+class HarvestProgress:
+    """In-memory mirror of harvest state, checkpointed in date order.
+
+    A day only counts as done once its parquet write has landed, so a resumed
+    run never skips a day that was still in flight.
+    """
+
+    def __init__(self):
+        self.writes: deque[tuple[date, Future | None]] = deque()
+        self.last_done: date | None = None
+        self.unsaved = 0
+
+    def add(self, day: date, write: Future | None) -> None:
+        self.writes.append((day, write))
+
+    def advance(self, wait: bool = False) -> None:
+        """Mark leading days done whose writes have finished (or all, if wait).
+
+        A failed write raises here and stays at the head of the queue, so no
+        later day is ever marked done past it.
+        """
+        while self.writes:
+            day, write = self.writes[0]
+            if write is not None:
+                if not (wait or write.done()):
+                    break
+                write.result()
+            self.writes.popleft()
+            self.last_done = day
+            self.unsaved += 1
+
+    def save(self) -> None:
+        if not self.unsaved:
+            return
+        save_state("oai_harvest", {"last_fetched_date": self.last_done.isoformat()})
+        self.unsaved = 0
+
+
+def _exit_on_sigterm(signum, frame):
+    # Unwind through run()'s finally so completed days are checkpointed
+    raise SystemExit(128 + signum)
+
+
 def run() -> bool:
     """Harvest arXiv metadata by date. Returns True if more work to do."""
     print("Harvesting arXiv metadata (date-partitioned)...")
@@ -155,7 +291,6 @@ def run() -> bool:
 
     state = load_state("oai_harvest")
     last_fetched = state.get("last_fetched_date")
-    fetched_dates = set(state.get("fetched_dates", []))
 
     target_end = date.today() - timedelta(days=2)  # T-2 for timezone safety
     start_date = date.fromisoformat(last_fetched) + timedelta(days=1) if last_fetched else EARLIEST_DATE
@@ -166,27 +301,42 @@ def run() -> bool:
 
     print(f"  Fetching {start_date} to {target_end}")
 
+    # Fetching stays on this thread (it is rate limited anyway); parquet
+    # serialization and upload run on one worker, overlapping the next fetch.
+    # A single worker because save_raw_parquet (cache eviction, write
+    # tracking) is not safe to run concurrently with itself
     current = start_date
-    while current <= target_end:
-        if time.time() - start_time >= GH_ACTIONS_MAX_RUN_SECONDS:
-            print(f"  Time budget exhausted")
-            return True
-
-        print(f"  {current}: ", end="")
-        records = fetch_date(current)
-
-        if records:
-            table = pa.Table.from_pylist(records, schema=SCHEMA)
-            save_raw_parquet(table, f"papers/{current.isoformat()}")
-            fetched_dates.add(current.isoformat())
-
-        save_state("oai_harvest", {
-            "last_fetched_date": current.isoformat(),
-            "fetched_dates": sorted(fetched_dates)
-        })
-
-        current += timedelta(days=1)
-        time.sleep(3)
+    progress = HarvestProgress()
+    previous_handler = signal.signal(signal.SIGTERM, _exit_on_sigterm)
+    with ThreadPoolExecutor(max_workers=1) as writer:
+        try:
+            while current <= target_end:
+                if time.time() - start_time >= GH_ACTIONS_MAX_RUN_SECONDS:
+                    print(f"  Time budget exhausted")
+                    break
+
+                records = fetch_date(current)
+                print(f"  {current}: +{len(records)}")
+                write = None
+                if records:
+                    # Carry the DAG task context into the worker for write tracking
+                    write = writer.submit(contextvars.copy_context().run, write_day, current, records)
+                progress.add(current, write)
+                current += timedelta(days=1)
+
+                progress.advance()
+                if progress.unsaved >= SAVE_EVERY:
+                    progress.save()
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
+            try:
+                progress.advance(wait=True)
+            finally:
+                # Checkpoint up to the day before any failed write
+                progress.save()
+
+    if current <= target_end:
+        return True
 
     print(f"  Complete!")
     return False
@@ -1,12 +1,12 @@
 """Transform arXiv metadata into papers dataset.
 
-- Diffs ingest state vs transform state to find new dates
+- Diffs raw papers/ parquet files vs transform state to find new dates
 - Uses DuckDB for efficient transformation
 - Merges to Delta table by ID
 """
 import duckdb
 import pyarrow as pa
-from subsets_utils import load_state, save_state, upload_data, sync_metadata, validate
+from subsets_utils import load_state, save_state, upload_data, sync_metadata, validate, list_raw_assets
 from subsets_utils.duckdb import raw
 
 METADATA = {
@@ -34,11 +34,10 @@ def run():
     """Transform new dates incrementally."""
     print("Transforming arXiv papers...")
 
-    # Diff ingest vs transform state
-    ingest_state = load_state("oai_harvest")
+    # Diff harvested days (one raw parquet per day) vs transform state
     transform_state = load_state("papers")
 
-    fetched = set(ingest_state.get("fetched_dates", []))
+    fetched = {asset.rsplit("/", 1)[-1] for asset in list_raw_assets("papers")}
     transformed = set(transform_state.get("transformed_dates", []))
     new_dates = sorted(fetched - transformed)
 
@@ -1,5 +1,5 @@
-from .http_client import get, post, put, delete
-from .io import upload_data, sync_data, load_state, save_state, load_asset, has_changed, save_raw_json, load_raw_json, save_raw_file, load_raw_file, save_raw_parquet, load_raw_parquet, get_raw_path
+from .http_client import get, get_stream, post, put, delete
+from .io import upload_data, sync_data, load_state, save_state, load_asset, has_changed, save_raw_json, load_raw_json, save_raw_file, load_raw_file, save_raw_parquet, load_raw_parquet, get_raw_path, list_raw_assets
 from .dag import DAG
 from . import duckdb
 from .environment import validate_environment, get_data_dir
@@ -8,10 +8,10 @@ from .testing import validate
 from . import debug
 
 __all__ = [
-    'get', 'post', 'put', 'delete',
+    'get', 'get_stream', 'post', 'put', 'delete',
     'upload_data', 'sync_data', 'load_state', 'save_state', 'load_asset', 'has_changed',
     'save_raw_json', 'load_raw_json', 'save_raw_file', 'load_raw_file',
-    'save_raw_parquet', 'load_raw_parquet', 'get_raw_path',
+    'save_raw_parquet', 'load_raw_parquet', 'get_raw_path', 'list_raw_assets',
     'validate_environment', 'get_data_dir',
     'sync_metadata',
     'validate',
@@ -1,11 +1,15 @@
 import os
 import httpx
 import time
+from contextlib import contextmanager
+from typing import Iterator
 from . import debug
 
 _client = None
 _client_config = {
     'timeout': int(os.environ.get('HTTP_TIMEOUT', '30')),
+    # httpx's default of 5s drops idle connections between rate-limited requests
+    'keepalive_expiry': float(os.environ.get('HTTP_KEEPALIVE_EXPIRY', '60')),
     'headers': {'User-Agent': os.environ.get('HTTP_USER_AGENT', 'DataIntegrations/1.0')}
 }
 
@@ -17,6 +21,12 @@ def _get_or_create_client() -> httpx.Client:
         _client = httpx.Client(
             timeout=_client_config['timeout'],
             headers=_client_config['headers'],
+            # Keep httpx's default pool caps; only the idle expiry is overridden
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=_client_config['keepalive_expiry'],
+            ),
             follow_redirects=True
         )
 
@@ -42,10 +52,35 @@ def _logged_request(method: str, url: str, **kwargs) -> httpx.Response:
         debug.log_http_request(method, url, status, duration_ms=duration_ms, error=error)
 
 
+@contextmanager
+def _logged_stream(method: str, url: str, **kwargs) -> Iterator[httpx.Response]:
+    """Open a streaming HTTP request, logging it once the body is consumed or abandoned."""
+    client = _get_or_create_client()
+    start = time.time()
+    error = None
+    status = None
+
+    try:
+        with client.stream(method, url, **kwargs) as response:
+            status = response.status_code
+            yield response
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        duration_ms = int((time.time() - start) * 1000)
+        debug.log_http_request(method, url, status, duration_ms=duration_ms, error=error)
+
+
 def get(url: str, **kwargs) -> httpx.Response:
     return _logged_request("GET", url, **kwargs)
 
 
+def get_stream(url: str, **kwargs):
+    """GET without buffering the body. Use as a context manager and read via iter_bytes()."""
+    return _logged_stream("GET", url, **kwargs)
+
+
 def post(url: str, **kwargs) -> httpx.Response:
     return _logged_request("POST", url, **kwargs)
 
@@ -15,7 +15,7 @@ import pyarrow.parquet as pq
 from deltalake import write_deltalake, DeltaTable
 from . import debug
 from .environment import get_data_dir
-from .r2 import _is_cloud_mode, upload_bytes, upload_file, download_bytes, get_storage_options, get_delta_table_uri, get_bucket_name, get_connector_name
+from .r2 import _is_cloud_mode, upload_bytes, upload_file, download_bytes, list_keys, get_storage_options, get_delta_table_uri, get_bucket_name, get_connector_name
 
 
 # --- Cloud mode disk cache ---
@@ -400,7 +400,7 @@ def load_raw_json(asset_id: str) -> any:
         raise FileNotFoundError(f"Raw asset '{asset_id}' not found.")
 
 
-def save_raw_parquet(data: pa.Table, asset_id: str, metadata: dict = None) -> str:
+def save_raw_parquet(data: pa.Table, asset_id: str, metadata: dict = None, compression: str = 'snappy') -> str:
     """Save raw PyArrow table as Parquet."""
     from .dag import track_write
     track_write(f"raw/{asset_id}", rows=data.num_rows)
@@ -416,7 +416,7 @@ def save_raw_parquet(data: pa.Table, asset_id: str, metadata: dict = None) -> st
 
         # Estimate size and evict if needed
         buffer = io.BytesIO()
-        pq.write_table(data, buffer, compression='snappy')
+        pq.write_table(data, buffer, compression=compression)
         _evict_if_needed(buffer.tell())
 
         # Write to cache
@@ -428,7 +428,7 @@ def save_raw_parquet(data: pa.Table, asset_id: str, metadata: dict = None) -> st
         return uri
     else:
         path = _raw_path(asset_id, "parquet")
-        pq.write_table(data, path, compression='snappy')
+        pq.write_table(data, path, compression=compression)
         print(f"  -> Raw Cache: Saved {asset_id}.parquet ({data.num_rows:,} rows)")
         return str(path)
 
@@ -473,3 +473,17 @@ def get_raw_path(asset_id: str, ext: str = "parquet") -> str:
     if _is_cloud_mode():
         return f"s3://{get_bucket_name()}/{_raw_key(asset_id, ext)}"
     return str(_raw_path(asset_id, ext))
+
+
+def list_raw_assets(prefix: str, ext: str = "parquet") -> list[str]:
+    """List raw asset ids under a prefix, e.g. 'papers' -> ['papers/2024-01-01', ...]."""
+    suffix = f".{ext}"
+    if _is_cloud_mode():
+        root = _raw_key("", ext)[:-len(suffix)]
+        keys = list_keys(f"{root}{prefix}/")
+        return sorted(k[len(root):-len(suffix)] for k in keys if k.endswith(suffix))
+    raw_dir = Path(get_data_dir()) / "raw"
+    return sorted(
+        str(path.relative_to(raw_dir))[:-len(suffix)]
+        for path in (raw_dir / prefix).glob(f"*{suffix}")
+    )
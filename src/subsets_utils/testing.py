@@ -29,6 +29,22 @@ Usage in asset test.py:
 
 import re
 import pyarrow as pa
+import pyarrow.compute as pc
+
+
+def _non_matching(table: pa.Table, column: str, pattern: str) -> list:
+    """Return non-null values not matching an RE2 pattern, evaluated in Arrow."""
+    values = pc.drop_null(table.column(column))
+    value_type = values.type.value_type if pa.types.is_dictionary(values.type) else values.type
+    if pa.types.is_string(value_type) or pa.types.is_large_string(value_type):
+        text = pc.cast(values, value_type)
+    elif pa.types.is_integer(value_type) or pa.types.is_date(value_type):
+        # Arrow renders these exactly as str(v) does
+        text = pc.cast(values, pa.string())
+    else:
+        # Other types format differently in Arrow (2024.0 casts to "2024"), so match str(v)
+        text = pa.array([str(v) for v in values.to_pylist()], pa.string())
+    return pc.filter(values, pc.invert(pc.match_substring_regex(text, pattern))).to_pylist()
 
 
 # =============================================================================
@@ -37,55 +53,44 @@ import pyarrow as pa
 
 def assert_valid_year(table: pa.Table, column: str) -> None:
     """Assert all non-null values are valid years (YYYY format, 4 digits)."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    pattern = re.compile(r"^\d{4}$")
-    invalid = [v for v in values if not pattern.match(str(v))]
+    invalid = _non_matching(table, column, r"^\d{4}$")
     assert not invalid, f"Column '{column}' has invalid year values: {invalid[:5]}..."
 
 
 def assert_valid_quarter(table: pa.Table, column: str) -> None:
     """Assert all non-null values are valid quarters (YYYY-QN format)."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    pattern = re.compile(r"^\d{4}-Q[1-4]$")
-    invalid = [v for v in values if not pattern.match(str(v))]
+    invalid = _non_matching(table, column, r"^\d{4}-Q[1-4]$")
     assert not invalid, f"Column '{column}' has invalid quarter values: {invalid[:5]}..."
 
 
 def assert_valid_month(table: pa.Table, column: str) -> None:
     """Assert all non-null values are valid months (YYYY-MM format)."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    pattern = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
-    invalid = [v for v in values if not pattern.match(str(v))]
+    invalid = _non_matching(table, column, r"^\d{4}-(0[1-9]|1[0-2])$")
     assert not invalid, f"Column '{column}' has invalid month values: {invalid[:5]}..."
 
 
 def assert_valid_week(table: pa.Table, column: str) -> None:
     """Assert all non-null values are valid weeks (YYYY-WNN format)."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    pattern = re.compile(r"^\d{4}-W(0[1-9]|[1-4]\d|5[0-3])$")
-    invalid = [v for v in values if not pattern.match(str(v))]
+    invalid = _non_matching(table, column, r"^\d{4}-W(0[1-9]|[1-4]\d|5[0-3])$")
     assert not invalid, f"Column '{column}' has invalid week values: {invalid[:5]}..."
 
 
 def assert_valid_date(table: pa.Table, column: str) -> None:
     """Assert all non-null values are valid dates (YYYY-MM-DD format)."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
-    pattern = re.compile(r"^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])$")
-    invalid = [v for v in values if not pattern.match(str(v))]
+    invalid = _non_matching(table, column, r"^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])$")
     assert not invalid, f"Column '{column}' has invalid date values: {invalid[:5]}..."
 
 
 def assert_valid_date_any(table: pa.Table, column: str) -> None:
     """Assert all non-null values match one of: YYYY, YYYY-QN, YYYY-MM, YYYY-WNN, YYYY-MM-DD."""
-    values = [v for v in table.column(column).to_pylist() if v is not None]
     patterns = [
-        re.compile(r"^\d{4}$"),  # Year
-        re.compile(r"^\d{4}-Q[1-4]$"),  # Quarter
-        re.compile(r"^\d{4}-(0[1-9]|1[0-2])$"),  # Month
-        re.compile(r"^\d{4}-W(0[1-9]|[1-4]\d|5[0-3])$"),  # Week
-        re.compile(r"^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])$"),  # Date
+        r"\d{4}",  # Year
+        r"\d{4}-Q[1-4]",  # Quarter
+        r"\d{4}-(0[1-9]|1[0-2])",  # Month
+        r"\d{4}-W(0[1-9]|[1-4]\d|5[0-3])",  # Week
+        r"\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])",  # Date
     ]
-    invalid = [v for v in values if not any(p.match(str(v)) for p in patterns)]
+    invalid = _non_matching(table, column, f"^({'|'.join(patterns)})$")
     assert not invalid, f"Column '{column}' has invalid date values: {invalid[:5]}..."
 
 
@@ -211,13 +216,17 @@ def validate(table: pa.Table, schema: dict) -> None:
         if isinstance(unique, str):
             unique = [unique]
 
+        # Counted with Arrow kernels; nulls count as one distinct value, like a Python set.
+        # Repeated NaN keys are duplicates here (a set of floats let them all through)
         if len(unique) == 1:
-            values = table.column(unique[0]).to_pylist()
-            duplicates = len(values) - len(set(values))
+            column = table.column(unique[0])
+            if pa.types.is_dictionary(column.type):
+                # count_distinct has no dictionary kernel; count the decoded values
+                column = pc.cast(column, column.type.value_type)
+            distinct = pc.count_distinct(column, mode="all").as_py()
+            duplicates = len(table) - distinct
             assert duplicates == 0, f"Column '{unique[0]}' has {duplicates} duplicate values"
         else:
-            # Composite key - convert columns once, then zip
-            columns_as_lists = [table.column(col).to_pylist() for col in unique]
-            rows = list(zip(*columns_as_lists))
-            duplicates = len(rows) - len(set(rows))
+            distinct = len(table.select(unique).group_by(unique).aggregate([]))
+            duplicates = len(table) - distinct
             assert duplicates == 0, f"Columns {unique} have {duplicates} duplicate combinations"